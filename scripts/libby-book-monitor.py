@@ -11,16 +11,27 @@ Uses the OverDrive Thunder API (no authentication required).
 __version__ = "1.0.0"
 
 import argparse
+import collections
+import functools
 import json
+import math
 import os
+import re
+import stat
 import sys
+import threading
 import time
-import urllib.error
 import urllib.parse
-import urllib.request
-from datetime import datetime
 from pathlib import Path
 
+# http.client, concurrent.futures, tempfile and datetime are imported where
+# they are used: they are slow to import and most runs need only some of them
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib json is the fallback
+    orjson = None
+
 # --- Configuration ---
 
 DEFAULT_DATA_DIR = Path.home() / ".libby-book-monitor"
@@ -28,6 +39,90 @@ API_BASE = "https://thunder.api.overdrive.com/v2/libraries"
 USER_AGENT = f"libby-book-monitor/{__version__}"
 REQUEST_TIMEOUT = 10
 RATE_LIMIT_SECONDS = 1
+CHECK_WORKERS = 2
+# Libraries up to this size may be paged through instead of searched per book
+CATALOG_MAX_ITEMS = 5000
+CATALOG_PAGE_SIZE = 300
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.5
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Give up rather than retry when the server asks us to wait longer than this
+RETRY_AFTER_MAX_SECONDS = 60
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+MAX_REDIRECTS = 5
+HTTP_CACHE_MAX_AGE_SECONDS = 30 * 24 * 3600
+# Compact the watchlist change log once it outgrows the snapshot this much
+LOG_COMPACT_RATIO = 2
+
+# Item fields read by the commands; everything else is dropped on receipt
+ITEM_FIELDS = (
+    "title",
+    "firstCreatorName",
+    "isOwned",
+    "ownedCopies",
+    "isAvailable",
+    "availableCopies",
+)
+
+
+def _json_loads(data):
+    """Parse JSON from bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj, indent=True):
+    """Serialize to UTF-8 JSON bytes, indented unless indent is False."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _atomic_write(path, data):
+    """Write bytes to path via a synced temp file and rename, so neither
+    readers nor a crash can leave a partially written file.
+
+    Keeps the existing file's permissions, or the umask default for a new one.
+    """
+    import tempfile
+
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+_ensured_dirs = set()
+_watchlist_cache = {}
+
+
+def _ensure_dir(path):
+    """Create a directory, skipping the syscall if already done this run."""
+    if path not in _ensured_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(path)
 
 
 def get_data_dir(args_data_dir=None):
@@ -47,9 +142,18 @@ def get_watchlist_path(data_dir, profile=None):
     return data_dir / "watchlist.json"
 
 
+def get_watchlist_log_path(data_dir, profile=None):
+    """Get the change log path that accompanies a watchlist file."""
+    return get_watchlist_path(data_dir, profile).with_suffix(".jsonl")
+
+
+@functools.lru_cache(maxsize=8)
 def load_config(data_dir):
-    """Load or create default configuration."""
-    data_dir.mkdir(parents=True, exist_ok=True)
+    """Load or create default configuration.
+
+    Cached per data directory; treat the returned dict as read-only.
+    """
+    _ensure_dir(data_dir)
     config_path = data_dir / "config.json"
 
     if not config_path.exists():
@@ -59,65 +163,597 @@ def load_config(data_dir):
                 "telaviv": "Israel Digital",
             },
         }
-        with open(config_path, "w", encoding="utf-8") as f:
-            json.dump(default_config, f, indent=2, ensure_ascii=False)
+        _atomic_write(config_path, _json_dumps(default_config))
         return default_config
 
-    with open(config_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _json_loads(config_path.read_bytes())
 
 
-def load_watchlist(data_dir, profile=None):
-    """Load watchlist for the given profile."""
-    data_dir.mkdir(parents=True, exist_ok=True)
+def _load_json_watchlist(data_dir, profile=None):
+    """Read a JSON watchlist snapshot and replay its change log."""
     path = get_watchlist_path(data_dir, profile)
-    if not path.exists():
-        return {"books": []}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    if path.exists():
+        watchlist = _json_loads(path.read_bytes())
+    else:
+        watchlist = {"books": []}
+
+    log_path = get_watchlist_log_path(data_dir, profile)
+    if log_path.exists():
+        index = _title_index(watchlist)
+        with open(log_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = _json_loads(line)
+                except ValueError:
+                    continue  # torn line from an interrupted write
+                idx = index.get(entry["title"].lower())
+                if entry["op"] == "update" and idx is not None:
+                    watchlist["books"][idx].update(entry["fields"])
+    return watchlist
+
+
+def get_watchlist_db_path(data_dir, profile=None):
+    """Get the SQLite watchlist path for the given profile."""
+    return get_watchlist_path(data_dir, profile).with_suffix(".db")
+
+
+@functools.lru_cache(maxsize=8)
+def _use_sqlite(data_dir, profile=None, backend=None):
+    """Whether to store the watchlist in SQLite.
+
+    An explicit backend wins; otherwise SQLite is used once a watchlist
+    database exists. Cached, so the database is looked for once per run.
+    """
+    if backend:
+        return backend == "sqlite"
+    return get_watchlist_db_path(data_dir, profile).exists()
+
+
+_DB_COLUMNS = (
+    "title",
+    "author",
+    "library",
+    "added",
+    "last_status",
+    "last_checked",
+    "found_date",
+)
+_DB_INSERT = (
+    f"INSERT OR IGNORE INTO books (title_lower, {', '.join(_DB_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * (len(_DB_COLUMNS) + 1))})"
+)
+
+
+def _db_row(book):
+    """Convert a watchlist book to a books table row."""
+    return (book["title"].lower(), *(book.get(c) for c in _DB_COLUMNS))
+
 
+_db_connections = {}
+
+
+def _watchlist_db(data_dir, profile=None):
+    """Open (once per run) the SQLite watchlist, creating it if needed.
+
+    A new database is populated from the profile's JSON watchlist, which
+    is left in place.
+    """
+    import sqlite3
+
+    path = get_watchlist_db_path(data_dir, profile)
+    if path in _db_connections:
+        return _db_connections[path]
+
+    _ensure_dir(data_dir)
+    is_new = not path.exists()
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS books (
+            title_lower TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            author TEXT,
+            library TEXT,
+            added TEXT,
+            last_status TEXT,
+            last_checked TEXT,
+            found_date TEXT
+        )"""
+    )
+    if is_new:
+        books = _load_json_watchlist(data_dir, profile)["books"]
+        with conn:
+            conn.executemany(_DB_INSERT, map(_db_row, books))
+    _db_connections[path] = conn
+    return conn
+
+
+def load_watchlist(data_dir, profile=None, backend=None):
+    """Load watchlist for the given profile.
+
+    JSON watchlists are read from the snapshot plus any updates in the
+    change log. Cached per file; the save functions keep the cache current.
+    """
+    _ensure_dir(data_dir)
+    use_db = _use_sqlite(data_dir, profile, backend)
+    if use_db:
+        path = get_watchlist_db_path(data_dir, profile)
+    else:
+        path = get_watchlist_path(data_dir, profile)
+    if path in _watchlist_cache:
+        return _watchlist_cache[path]
+
+    if use_db:
+        rows = _watchlist_db(data_dir, profile).execute(
+            f"SELECT {', '.join(_DB_COLUMNS)} FROM books ORDER BY rowid"
+        )
+        watchlist = {"books": [dict(zip(_DB_COLUMNS, row)) for row in rows]}
+    else:
+        watchlist = _load_json_watchlist(data_dir, profile)
+
+    _watchlist_cache[path] = watchlist
+    return watchlist
+
+
+def save_watchlist(data_dir, watchlist, profile=None, backend=None):
+    """Save the full watchlist, clearing the JSON change log."""
+    _ensure_dir(data_dir)
+    if _use_sqlite(data_dir, profile, backend):
+        conn = _watchlist_db(data_dir, profile)
+        with conn:
+            conn.execute("DELETE FROM books")
+            conn.executemany(_DB_INSERT, map(_db_row, watchlist["books"]))
+        _watchlist_cache[get_watchlist_db_path(data_dir, profile)] = watchlist
+        return
 
-def save_watchlist(data_dir, watchlist, profile=None):
-    """Save watchlist for the given profile."""
-    data_dir.mkdir(parents=True, exist_ok=True)
     path = get_watchlist_path(data_dir, profile)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(watchlist, f, indent=2, ensure_ascii=False)
+    data = {k: v for k, v in watchlist.items() if k != "_index"}
+    _atomic_write(path, _json_dumps(data))
+    get_watchlist_log_path(data_dir, profile).unlink(missing_ok=True)
+    _watchlist_cache[path] = watchlist
+
+
+def add_to_watchlist(data_dir, watchlist, book, profile=None, backend=None):
+    """Append a book to the watchlist and persist it."""
+    watchlist["books"].append(book)
+    _title_index(watchlist)[book["title"].lower()] = len(watchlist["books"]) - 1
+    if _use_sqlite(data_dir, profile, backend):
+        conn = _watchlist_db(data_dir, profile)
+        with conn:
+            conn.execute(_DB_INSERT, _db_row(book))
+    else:
+        save_watchlist(data_dir, watchlist, profile, backend)
+
+
+def remove_from_watchlist(data_dir, watchlist, idx, profile=None, backend=None):
+    """Remove the book at position idx from the watchlist and persist it."""
+    book = watchlist["books"].pop(idx)
+    # Positions after idx have shifted; rebuild the index on next use
+    watchlist.pop("_index", None)
+    if _use_sqlite(data_dir, profile, backend):
+        conn = _watchlist_db(data_dir, profile)
+        with conn:
+            conn.execute(
+                "DELETE FROM books WHERE title_lower = ?", (book["title"].lower(),)
+            )
+    else:
+        save_watchlist(data_dir, watchlist, profile, backend)
+
+
+def log_watchlist_updates(data_dir, watchlist, updates, profile=None, backend=None):
+    """Record per-book field updates without rewriting the watchlist.
+
+    updates is a list of (title, fields) pairs already applied to the
+    in-memory watchlist. SQLite watchlists update just those rows. JSON
+    watchlists append them to the change log, which is compacted into a
+    new snapshot once it grows past LOG_COMPACT_RATIO times the snapshot
+    size.
+    """
+    if not updates:
+        return
+    if _use_sqlite(data_dir, profile, backend):
+        conn = _watchlist_db(data_dir, profile)
+        with conn:
+            for title, fields in updates:
+                assignments = ", ".join(f"{k} = ?" for k in fields)
+                conn.execute(
+                    f"UPDATE books SET {assignments} WHERE title_lower = ?",
+                    (*fields.values(), title.lower()),
+                )
+        return
+
+    path = get_watchlist_path(data_dir, profile)
+    log_path = get_watchlist_log_path(data_dir, profile)
+    if not path.exists():
+        save_watchlist(data_dir, watchlist, profile, backend)
+        return
+
+    lines = [
+        _json_dumps({"op": "update", "title": title, "fields": fields}, indent=False)
+        + b"\n"
+        for title, fields in updates
+    ]
+    with open(log_path, "a+b") as f:
+        # Start on a fresh line if an interrupted write left a torn one
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                lines.insert(0, b"\n")
+        f.write(b"".join(lines))
+
+    if log_path.stat().st_size > LOG_COMPACT_RATIO * path.stat().st_size:
+        save_watchlist(data_dir, watchlist, profile, backend)
+
+
+def load_http_cache(data_dir):
+    """Load the cache of conditional-GET validators and response bodies.
+
+    Keys are request paths, plus the "catalog:<library>" size records of
+    _prefetch_catalogs.
+    """
+    path = data_dir / "http_cache.json"
+    if not path.exists():
+        return {}
+    try:
+        return _json_loads(path.read_bytes())
+    except ValueError:
+        return {}
+
+
+def save_http_cache(data_dir, cache):
+    """Save the HTTP cache if a response body or validator changed.
+
+    Entries neither used this run nor fetched within
+    HTTP_CACHE_MAX_AGE_SECONDS are dropped. search_library and
+    _prefetch_catalogs mark entries with the in-memory "_used"/"_changed"
+    flags, which are not saved.
+    """
+    cutoff = time.time() - HTTP_CACHE_MAX_AGE_SECONDS
+    keep = {
+        url: e for url, e in cache.items() if e.get("_used") or e["fetched"] >= cutoff
+    }
+    if len(keep) == len(cache) and not any(e.get("_changed") for e in keep.values()):
+        return
+    data = {
+        url: {k: v for k, v in e.items() if not k.startswith("_")}
+        for url, e in keep.items()
+    }
+    _ensure_dir(data_dir)
+    _atomic_write(data_dir / "http_cache.json", _json_dumps(data))
+
+
+def _title_index(watchlist):
+    """Return the {lowercased title: position} index of a watchlist.
+
+    Built on first use and kept on the in-memory watchlist under "_index";
+    it is never written to disk.
+    """
+    index = watchlist.get("_index")
+    if index is None:
+        index = {b["title"].lower(): i for i, b in enumerate(watchlist["books"])}
+        watchlist["_index"] = index
+    return index
 
 
 # --- API ---
 
 
-def search_library(library_code, query):
-    """Search a library catalogue via the Thunder API.
+_local = threading.local()
+_connections = set()
+_connections_lock = threading.Lock()
+_rate_lock = threading.Lock()
+_next_request_at = 0.0
+
+
+def _get_connection():
+    """Return this thread's keep-alive connection to the API host.
 
-    Returns the parsed JSON response, or None on error.
+    Honours the same proxy environment variables as urllib (https_proxy,
+    no_proxy, ...), tunnelling through the proxy with CONNECT.
     """
-    encoded_query = urllib.parse.quote(query, safe="")
-    url = f"{API_BASE}/{library_code}/media?query={encoded_query}"
+    import base64
+    import http.client
+    import urllib.request
+
+    conn = getattr(_local, "connection", None)
+    if conn is not None:
+        return conn
+
+    parts = urllib.parse.urlsplit(API_BASE)
+    if parts.scheme == "https":
+        conn_cls = http.client.HTTPSConnection
+    else:
+        conn_cls = http.client.HTTPConnection
+
+    proxy = None
+    if not urllib.request.proxy_bypass(parts.hostname):
+        proxy = urllib.request.getproxies().get(parts.scheme)
+    if proxy:
+        if "://" not in proxy:
+            proxy = f"http://{proxy}"
+        proxy_parts = urllib.parse.urlsplit(proxy)
+        tunnel_headers = {}
+        if proxy_parts.username:
+            user = urllib.parse.unquote(proxy_parts.username)
+            password = urllib.parse.unquote(proxy_parts.password or "")
+            token = base64.b64encode(f"{user}:{password}".encode()).decode("ascii")
+            tunnel_headers["Proxy-Authorization"] = f"Basic {token}"
+        conn = conn_cls(
+            proxy_parts.hostname, proxy_parts.port, timeout=REQUEST_TIMEOUT
+        )
+        conn.set_tunnel(parts.hostname, parts.port, headers=tunnel_headers)
+    else:
+        conn = conn_cls(parts.netloc, timeout=REQUEST_TIMEOUT)
+    _local.connection = conn
+    with _connections_lock:
+        _connections.add(conn)
+    return conn
+
+
+def _reset_connection():
+    """Drop this thread's connection so the next request reconnects."""
+    conn = getattr(_local, "connection", None)
+    if conn is not None:
+        conn.close()
+        _local.connection = None
+        with _connections_lock:
+            _connections.discard(conn)
+
+
+def close_connections():
+    """Close the API connections opened by every thread.
+
+    Call once no more requests are in flight, e.g. after a worker pool
+    has shut down.
+    """
+    with _connections_lock:
+        for conn in _connections:
+            conn.close()
+        _connections.clear()
+
+
+def _wait_for_rate_limit(interval=RATE_LIMIT_SECONDS):
+    """Block until the next request slot.
+
+    Slots are shared across threads so that request starts stay at least
+    interval seconds apart, however many requests are in flight. Time
+    already spent waiting on a slow response counts towards the interval.
+    """
+    global _next_request_at
+    with _rate_lock:
+        now = time.monotonic()
+        delay = _next_request_at - now
+        _next_request_at = max(now, _next_request_at) + interval
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _defer_requests(delay):
+    """Hold back the next request slot, for every thread, by delay seconds."""
+    global _next_request_at
+    with _rate_lock:
+        _next_request_at = max(_next_request_at, time.monotonic() + delay)
+
+
+def _retry_after(headers):
+    """Return the seconds a Retry-After header asks to wait, or None."""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    import email.utils
 
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _urlopen_get(url, headers):
+    """GET an arbitrary URL through urllib. Returns (status, reason, headers, body)."""
+    import urllib.error
+    import urllib.request
+
+    req = urllib.request.Request(url, headers=headers)
     try:
         with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as resp:
-            return json.loads(resp.read().decode("utf-8"))
+            return resp.status, resp.reason, resp.headers, resp.read()
     except urllib.error.HTTPError as e:
-        print(f"Error: HTTP {e.code} - {e.reason}", file=sys.stderr)
-    except urllib.error.URLError as e:
-        print(f"Error: {e.reason}", file=sys.stderr)
+        return e.code, e.reason, e.headers, e.read()
+
+
+def _api_get(path, headers=None, rate_limit=RATE_LIMIT_SECONDS):
+    """GET a path on the API host, reusing one keep-alive connection.
+
+    Every request, retries included, first waits for a rate-limit slot
+    (see _wait_for_rate_limit). Dropped connections and transient HTTP
+    statuses are retried with exponential backoff, honouring Retry-After;
+    other errors, such as refused connections, timeouts or certificate
+    failures, are raised at once. Redirects within the API host stay on
+    the connection; redirects elsewhere are fetched through urllib.
+    Returns (status, reason, headers, body).
+    """
+    import http.client
+
+    api = urllib.parse.urlsplit(API_BASE)
+    headers = {"User-Agent": USER_AGENT, **(headers or {})}
+    attempt = 0
+    redirects = 0
+    while True:
+        _wait_for_rate_limit(rate_limit)
+        conn = _get_connection()
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.HTTPException, OSError) as e:
+            _reset_connection()
+            # Only a dropped keep-alive connection is worth another try
+            dropped = isinstance(
+                e,
+                (
+                    http.client.HTTPException,
+                    BrokenPipeError,
+                    ConnectionAbortedError,
+                    ConnectionResetError,
+                ),
+            )
+            if not dropped or attempt == MAX_RETRIES:
+                raise
+        else:
+            if resp.will_close:
+                _reset_connection()
+            location = resp.getheader("Location")
+            if (
+                resp.status in REDIRECT_STATUSES
+                and location
+                and redirects < MAX_REDIRECTS
+            ):
+                redirects += 1
+                base = f"{api.scheme}://{api.netloc}{path}"
+                url = urllib.parse.urljoin(base, location)
+                target = urllib.parse.urlsplit(url)
+                if (target.scheme, target.netloc) != (api.scheme, api.netloc):
+                    return _urlopen_get(url, headers)
+                path = urllib.parse.urlunsplit(("", "", target.path, target.query, ""))
+                continue
+            if resp.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return resp.status, resp.reason, resp.headers, body
+            retry_after = _retry_after(resp.headers)
+            if retry_after is not None:
+                if retry_after > RETRY_AFTER_MAX_SECONDS:
+                    return resp.status, resp.reason, resp.headers, body
+                _defer_requests(retry_after)
+        time.sleep(RETRY_BACKOFF_SECONDS * 2**attempt)
+        attempt += 1
+
+
+# A search result item, decoded from the API's camelCase fields
+Item = collections.namedtuple(
+    "Item",
+    "title author is_owned owned_copies is_available available_copies",
+)
+
+
+def _to_item(d, title="Unknown", author="Unknown", _get=dict.get):
+    """Decode one search result dict into an Item.
+
+    title and author are used when the result lacks those fields.
+    """
+    return Item(
+        _get(d, "title", title),
+        _get(d, "firstCreatorName", author),
+        _get(d, "isOwned", False),
+        _get(d, "ownedCopies", 0),
+        _get(d, "isAvailable", False),
+        _get(d, "availableCopies", 0),
+    )
+
+
+def _slim_response(data):
+    """Reduce a search response to totalItems and the ITEM_FIELDS of each item."""
+    return {
+        "totalItems": data.get("totalItems", 0),
+        "items": [
+            {k: item[k] for k in ITEM_FIELDS if k in item}
+            for item in data.get("items") or ()
+        ],
+    }
+
+
+def _search_path(library_code, query, page=None, per_page=None):
+    """Build the API request path for a catalogue search."""
+    encoded_query = urllib.parse.quote(query, safe="")
+    base_path = urllib.parse.urlsplit(API_BASE).path
+    path = f"{base_path}/{library_code}/media?query={encoded_query}"
+    if page is not None:
+        path += f"&perPage={per_page}&page={page}"
+    return path
+
+
+def search_library(
+    library_code,
+    query,
+    page=None,
+    per_page=None,
+    cache=None,
+    rate_limit=RATE_LIMIT_SECONDS,
+):
+    """Search a library catalogue via the Thunder API.
+
+    An empty query lists the whole catalogue; use page/per_page to walk it.
+    If a cache dict (see load_http_cache) is given, the request is made
+    conditional on the stored ETag/Last-Modified and a 304 response is
+    answered from the cache. rate_limit is passed on to _api_get.
+
+    Returns the parsed response reduced to the fields the commands use
+    (see _slim_response), or None on error.
+    """
+    path = _search_path(library_code, query, page, per_page)
+
+    entry = cache.get(path) if cache is not None else None
+    headers = {}
+    if entry:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        status, reason, resp_headers, body = _api_get(path, headers, rate_limit)
+        if status == 304 and entry:
+            entry["_used"] = True
+            return entry["body"]
+        if status != 200:
+            print(f"Error: HTTP {status} - {reason}", file=sys.stderr)
+            return None
+        data = _slim_response(_json_loads(body))
+        etag = resp_headers.get("ETag")
+        last_modified = resp_headers.get("Last-Modified")
+        if cache is not None and (etag or last_modified):
+            cache[path] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "body": data,
+                "fetched": time.time(),
+                "_used": True,
+                "_changed": True,
+            }
+        return data
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
     return None
 
 
+# Words, with each CJK character counted as a word since those scripts
+# do not separate words with spaces
+_WORD_RE = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]|\w+")
+
+
+def _title_key(title):
+    """Normalize a title to the set of its casefolded words."""
+    return frozenset(_WORD_RE.findall(title.casefold()))
+
+
+def title_key_matches(search_key, result_title):
+    """Like title_matches, with the search title already passed through _title_key."""
+    return bool(search_key) and search_key <= _title_key(result_title)
+
+
 def title_matches(search_title, result_title):
-    """Case-insensitive substring match in either direction.
+    """Match if every word of search_title appears in result_title.
 
-    Good enough for matching catalogue results to watchlist entries.
-    May false-positive on very short titles.
+    Ignores case, punctuation and word order, so subtitles and reordered
+    title parts still match while "It" no longer matches "Kitten" and
+    "Dune Messiah" no longer matches "Dune".
+    May false-positive on very short or common titles.
     """
-    a = search_title.lower().strip()
-    b = result_title.lower().strip()
-    return a in b or b in a
+    return title_key_matches(_title_key(search_title), result_title)
 
 
 # --- Commands ---
@@ -131,6 +767,7 @@ def cmd_search(args, data_dir):
     print(f'Searching "{query}" in {library_code}...\n')
 
     data = search_library(library_code, query)
+    close_connections()
     if data is None:
         return 1
 
@@ -141,51 +778,46 @@ def cmd_search(args, data_dir):
         print("No results found.")
         return 0
 
-    for idx, item in enumerate(items, 1):
-        title = item.get("title", "Unknown")
-        author = item.get("firstCreatorName", "Unknown")
-        is_owned = item.get("isOwned", False)
-        owned_copies = item.get("ownedCopies", 0)
-        is_available = item.get("isAvailable", False)
-        available_copies = item.get("availableCopies", 0)
-
-        status = "In catalogue" if is_owned else "Not owned"
-        avail = f"Yes ({available_copies})" if is_available else "No"
+    out = []
+    for idx, item in enumerate(map(_to_item, items), 1):
+        status = "In catalogue" if item.is_owned else "Not owned"
+        avail = f"Yes ({item.available_copies})" if item.is_available else "No"
 
-        print(f"  {idx}. {title} - {author}")
-        print(f"     {status} | Copies: {owned_copies} | Available: {avail}")
-        print()
+        out.append(f"  {idx}. {item.title} - {item.author}\n")
+        out.append(
+            f"     {status} | Copies: {item.owned_copies} | Available: {avail}\n\n"
+        )
 
-    print(f"{total} result(s) total")
+    out.append(f"{total} result(s) total\n")
+    sys.stdout.write("".join(out))
     return 0
 
 
 def cmd_watch(args, data_dir):
     """Add a book to the watchlist."""
+    from datetime import datetime
+
     config = load_config(data_dir)
-    watchlist = load_watchlist(data_dir, args.profile)
+    watchlist = load_watchlist(data_dir, args.profile, args.backend)
 
     library = args.library or config.get("default_library", "telaviv")
     title = args.title
     author = args.author or ""
 
-    for book in watchlist["books"]:
-        if book["title"].lower() == title.lower():
-            print(f"Already watching: {title}")
-            return 0
-
-    watchlist["books"].append(
-        {
-            "title": title,
-            "author": author,
-            "library": library,
-            "added": datetime.now().strftime("%Y-%m-%d"),
-            "last_status": "not_found",
-            "last_checked": None,
-            "found_date": None,
-        }
-    )
-    save_watchlist(data_dir, watchlist, args.profile)
+    if title.lower() in _title_index(watchlist):
+        print(f"Already watching: {title}")
+        return 0
+
+    book = {
+        "title": title,
+        "author": author,
+        "library": library,
+        "added": datetime.now().strftime("%Y-%m-%d"),
+        "last_status": "not_found",
+        "last_checked": None,
+        "found_date": None,
+    }
+    add_to_watchlist(data_dir, watchlist, book, args.profile, args.backend)
 
     print(f"Added to watchlist: {title}")
     if author:
@@ -196,26 +828,22 @@ def cmd_watch(args, data_dir):
 
 def cmd_unwatch(args, data_dir):
     """Remove a book from the watchlist."""
-    watchlist = load_watchlist(data_dir, args.profile)
+    watchlist = load_watchlist(data_dir, args.profile, args.backend)
     title = args.title
 
-    before = len(watchlist["books"])
-    watchlist["books"] = [
-        b for b in watchlist["books"] if b["title"].lower() != title.lower()
-    ]
-
-    if len(watchlist["books"]) < before:
-        save_watchlist(data_dir, watchlist, args.profile)
-        print(f"Removed: {title}")
-        return 0
+    idx = _title_index(watchlist).get(title.lower())
+    if idx is None:
+        print(f"Not found in watchlist: {title}")
+        return 1
 
-    print(f"Not found in watchlist: {title}")
-    return 1
+    remove_from_watchlist(data_dir, watchlist, idx, args.profile, args.backend)
+    print(f"Removed: {title}")
+    return 0
 
 
 def cmd_list(args, data_dir):
     """Show all books in the watchlist."""
-    watchlist = load_watchlist(data_dir, args.profile)
+    watchlist = load_watchlist(data_dir, args.profile, args.backend)
 
     if not watchlist["books"]:
         print("Watchlist is empty.")
@@ -225,8 +853,7 @@ def cmd_list(args, data_dir):
     label = f"Watchlist ({count} book{'s' if count != 1 else ''}):"
     if args.profile:
         label = f"Watchlist [{args.profile}] ({count} book{'s' if count != 1 else ''}):"
-    print(label)
-    print()
+    out = [f"{label}\n\n"]
 
     for idx, book in enumerate(watchlist["books"], 1):
         title = book["title"]
@@ -237,20 +864,163 @@ def cmd_list(args, data_dir):
         found_date = book.get("found_date")
 
         marker = "*" if status == "found" else " "
-        print(f"  {marker} {idx}. {title}")
+        out.append(f"  {marker} {idx}. {title}\n")
         if author:
-            print(f"       Author: {author}")
-        print(f"       Library: {library} | Status: {status} | Checked: {last_checked}")
+            out.append(f"       Author: {author}\n")
+        out.append(
+            f"       Library: {library} | Status: {status} | Checked: {last_checked}\n"
+        )
         if found_date:
-            print(f"       Found on: {found_date}")
-        print()
+            out.append(f"       Found on: {found_date}\n")
+        out.append("\n")
 
+    sys.stdout.write("".join(out))
     return 0
 
 
+def _book_queries(book, by_author):
+    """Return the (library, query) pairs to try, in order, for a book.
+
+    Books sharing a library and author are checked with one author query
+    first, falling back to a title query if that result list is truncated.
+    """
+    title = book["title"]
+    author = book.get("author", "")
+    library = book["library"]
+    title_query = (library, f"{title} {author}".strip())
+    group = by_author[(library, author.lower())]
+    if author and len(group) > 1:
+        return [(library, group[0]["author"]), title_query]
+    return [title_query]
+
+
+def _fetch_queries(keys, responses, http_cache, rate_limit, pool):
+    """Fetch the (library, query) pairs not yet in responses on the pool.
+
+    Each response is stored as (totalItems, [Item, ...]), or None on error.
+    """
+
+    def fetch(key):
+        return search_library(*key, cache=http_cache, rate_limit=rate_limit)
+
+    missing = [key for key in dict.fromkeys(keys) if key not in responses]
+    for key, data in zip(missing, pool.map(fetch, missing)):
+        if data is not None:
+            # Missing titles never match; missing authors fall back to the
+            # watchlist entry's in the notify output
+            items = [_to_item(d, title="", author=None) for d in data["items"]]
+            data = (data["totalItems"], items)
+        responses[key] = data
+
+
+def _page_count(total, page_len):
+    """Number of pages needed to list total items page_len at a time."""
+    return -(-total // page_len) if page_len else 0
+
+
+def _catalog_fits(total, page_len, searches):
+    """Whether a catalogue can be listed in at most the given number of requests.
+
+    An empty listing never fits, since the API may not list everything
+    for an empty query.
+    """
+    return (
+        page_len > 0
+        and total <= CATALOG_MAX_ITEMS
+        and _page_count(total, page_len) <= searches
+    )
+
+
+def _prefetch_catalogs(queries, responses, http_cache, rate_limit, pool):
+    """Fetch whole catalogues where that takes fewer requests than searching.
+
+    A library is paged through when it has at most CATALOG_MAX_ITEMS items
+    and no more pages than the distinct queries planned against it. The
+    first page doubles as the size probe. Its result is kept in http_cache
+    under "catalog:<library>", whatever validators the server sent, so
+    libraries found not to fit are not probed again until that record
+    expires (see save_http_cache).
+
+    Returns {library: [Item, ...]} for each catalogue fetched in full.
+    """
+    planned = {}
+    for library, _ in {book_queries[0] for book_queries in queries}:
+        planned[library] = planned.get(library, 0) + 1
+
+    probes = []
+    for library, count in planned.items():
+        if count < 2:
+            continue
+        size = http_cache.get(f"catalog:{library}")
+        if size and not _catalog_fits(size["total"], size["page_len"], count):
+            continue
+        probes.append((library, "", 1, CATALOG_PAGE_SIZE))
+    _fetch_queries(probes, responses, http_cache, rate_limit, pool)
+
+    catalogs = {}
+    rest = []
+    for key in probes:
+        library = key[0]
+        data = responses.pop(key)
+        if data is None:
+            continue
+        total, items = data
+        # The server may cap perPage, so size pages by what it returned
+        size_key = f"catalog:{library}"
+        size = {"total": total, "page_len": len(items)}
+        entry = http_cache.get(size_key)
+        if entry and all(entry[k] == v for k, v in size.items()):
+            entry["_used"] = True
+        else:
+            http_cache[size_key] = {
+                **size,
+                "fetched": time.time(),
+                "_used": True,
+                "_changed": True,
+            }
+        if not _catalog_fits(total, len(items), planned[library]):
+            continue
+        catalogs[library] = (total, items)
+        for page in range(2, _page_count(total, len(items)) + 1):
+            rest.append((library, "", page, CATALOG_PAGE_SIZE))
+    _fetch_queries(rest, responses, http_cache, rate_limit, pool)
+
+    for key in rest:
+        data = responses.pop(key)
+        if key[0] in catalogs and data is not None:
+            catalogs[key[0]][1].extend(data[1])
+        else:
+            catalogs.pop(key[0], None)
+    return {
+        library: items
+        for library, (total, items) in catalogs.items()
+        if len(items) >= total
+    }
+
+
+def _find_owned(title_key, items, author_key):
+    """Return the first owned Item matching a watched book.
+
+    The item title must contain every word of title_key (see
+    title_key_matches) and, when both are known, the item author must
+    share a word with author_key (a _title_key of the author). Search
+    results and whole catalogues are matched alike, so a book's outcome
+    does not depend on how its library was queried.
+    """
+    for item in items:
+        # Cheap ownership test first; most results are skipped without
+        # normalizing their title
+        if not item.is_owned or not title_key_matches(title_key, item.title):
+            continue
+        if author_key and item.author and not author_key & _title_key(item.author):
+            continue
+        return item
+    return None
+
+
 def cmd_check(args, data_dir):
     """Check all watchlist items against the API."""
-    watchlist = load_watchlist(data_dir, args.profile)
+    watchlist = load_watchlist(data_dir, args.profile, args.backend)
     notify_only = args.notify
 
     if not watchlist["books"]:
@@ -258,84 +1028,145 @@ def cmd_check(args, data_dir):
             print("Watchlist is empty.")
         return 0
 
+    from concurrent.futures import ThreadPoolExecutor
+    from datetime import datetime
+
     new_finds = []
-    total = len(watchlist["books"])
+    updates = []
+    # Found books only wait to be unwatched; re-query them only on request
+    books = [
+        b
+        for b in watchlist["books"]
+        if args.recheck_found or b["last_status"] != "found"
+    ]
+    total = len(books)
 
-    for idx, book in enumerate(watchlist["books"]):
-        title = book["title"]
-        author = book.get("author", "")
-        library = book["library"]
-        prev_status = book["last_status"]
+    by_author = {}
+    for book in books:
+        key = (book["library"], book.get("author", "").lower())
+        by_author.setdefault(key, []).append(book)
+    queries = [_book_queries(book, by_author) for book in books]
+    title_keys = [_title_key(book["title"]) for book in books]
+    author_keys = [_title_key(book.get("author", "")) for book in books]
 
-        query = f"{title} {author}".strip()
-        data = search_library(library, query)
+    # Per-run response cache keyed by (library, query)
+    responses = {}
+    http_cache = load_http_cache(data_dir)
+
+    pool = ThreadPoolExecutor(max_workers=CHECK_WORKERS)
+    try:
+        # Match books in fully fetched catalogues locally, under (library, None)
+        catalogs = _prefetch_catalogs(
+            queries, responses, http_cache, args.rate_limit, pool
+        )
+        for library, items in catalogs.items():
+            responses[(library, None)] = (len(items), items)
+        for i, book in enumerate(books):
+            if book["library"] in catalogs:
+                queries[i] = [(book["library"], None)]
+        results = [(None, None)] * total
+        pending = range(total)
+        while pending:
+            keys = [queries[i][0] for i in pending]
+            _fetch_queries(keys, responses, http_cache, args.rate_limit, pool)
+            retry = []
+            for i in pending:
+                library, query = queries[i].pop(0)
+                data = responses[(library, query)]
+                matched = None
+                truncated = True
+                if data is not None:
+                    found_total, items = data
+                    matched = _find_owned(title_keys[i], items, author_keys[i])
+                    truncated = found_total > len(items)
+                if matched is None and truncated and queries[i]:
+                    retry.append(i)
+                else:
+                    results[i] = (data, matched)
+            pending = retry
+    finally:
+        pool.shutdown()
+        close_connections()
+
+    if books:
+        save_http_cache(data_dir, http_cache)
+
+    now_dt = datetime.now()
+    now = now_dt.isoformat(timespec="seconds")
+    today = now_dt.strftime("%Y-%m-%d")
+
+    for book, (data, matched_item) in zip(books, results):
+        prev_status = book["last_status"]
 
         if data is None:
             continue
+        found = matched_item is not None
 
-        found = False
-        matched_item = None
-        for item in data.get("items", []):
-            if title_matches(title, item.get("title", "")) and item.get(
-                "isOwned", False
-            ):
-                found = True
-                matched_item = item
-                break
-
-        now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
         book["last_checked"] = now
 
         if found and prev_status == "not_found":
             book["last_status"] = "found"
-            book["found_date"] = datetime.now().strftime("%Y-%m-%d")
+            book["found_date"] = today
             new_finds.append((book, matched_item))
         elif found:
             book["last_status"] = "found"
         else:
             book["last_status"] = "not_found"
 
-        if idx < total - 1:
-            time.sleep(RATE_LIMIT_SECONDS)
+        fields = ("last_checked", "last_status", "found_date")
+        updates.append((book["title"], {k: book[k] for k in fields}))
 
-    save_watchlist(data_dir, watchlist, args.profile)
+    log_watchlist_updates(data_dir, watchlist, updates, args.profile, args.backend)
 
     # Output
+    out = []
     if notify_only:
         if new_finds:
-            print("New on Libby:\n")
+            out.append("New on Libby:\n\n")
             for book, item in new_finds:
-                t = item.get("title", book["title"]) if item else book["title"]
-                a = (
-                    item.get("firstCreatorName", book.get("author", ""))
-                    if item
-                    else book.get("author", "")
+                avail = "Yes" if item.is_available else "No"
+                author = item.author
+                if author is None:
+                    author = book.get("author", "")
+                out.append(f"  {item.title} - {author}\n")
+                out.append(
+                    f"    Library: {book['library']} | Copies: {item.owned_copies}"
+                    f" | Available: {avail}\n\n"
                 )
-                copies = item.get("ownedCopies", 0) if item else "?"
-                avail = "Yes" if (item and item.get("isAvailable")) else "No"
-                print(f"  {t} - {a}")
-                print(f"    Library: {book['library']} | Copies: {copies} | Available: {avail}")
-                print()
         # Exit silently if nothing new (useful for cron)
     else:
-        print(f"Checked {total} book(s).")
+        out.append(f"Checked {total} book(s).\n")
         if new_finds:
-            print(f"{len(new_finds)} new addition(s) found!")
+            out.append(f"{len(new_finds)} new addition(s) found!\n")
 
     # Remind about found books
     found_books = [b for b in watchlist["books"] if b["last_status"] == "found"]
     if found_books:
-        print(f"\n{len(found_books)} book(s) already in catalogue:")
+        out.append(f"\n{len(found_books)} book(s) already in catalogue:\n")
         for b in found_books:
-            print(f"  - {b['title']}")
-        print("Consider removing them with 'unwatch'.")
+            out.append(f"  - {b['title']}\n")
+        out.append("Consider removing them with 'unwatch'.\n")
 
+    sys.stdout.write("".join(out))
     return 0
 
 
 # --- CLI ---
 
 
+def _seconds(value):
+    """argparse type for a finite, non-negative number of seconds."""
+    try:
+        seconds = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value!r}") from None
+    if not math.isfinite(seconds) or seconds < 0:
+        raise argparse.ArgumentTypeError(
+            f"must be a finite number, 0 or more: {value!r}"
+        )
+    return seconds
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog="libby-book-monitor",
@@ -349,6 +1180,11 @@ def main():
         "--data-dir",
         help=f"Data directory (default: {DEFAULT_DATA_DIR}, or $LIBBY_BOOK_MONITOR_DATA)",
     )
+    parser.add_argument(
+        "--backend",
+        choices=["json", "sqlite"],
+        help="Watchlist storage (default: sqlite if a watchlist .db exists, else json)",
+    )
 
     subparsers = parser.add_subparsers(dest="command")
 
@@ -377,6 +1213,18 @@ def main():
         action="store_true",
         help="Only print newly found books (for cron/automation)",
     )
+    sp.add_argument(
+        "--recheck-found",
+        action="store_true",
+        help="Also re-query books already found (skipped by default)",
+    )
+    sp.add_argument(
+        "--rate-limit",
+        type=_seconds,
+        default=RATE_LIMIT_SECONDS,
+        metavar="SECONDS",
+        help=f"Minimum delay between API requests (default: {RATE_LIMIT_SECONDS})",
+    )
 
     args = parser.parse_args()
     if not args.command:
@@ -384,6 +1232,14 @@ def main():
         return 1
 
     data_dir = get_data_dir(args.data_dir)
+    # The JSON files stop being updated once a watchlist is migrated
+    db_path = get_watchlist_db_path(data_dir, args.profile)
+    if args.backend == "json" and db_path.exists():
+        parser.error(
+            f"--backend json: this watchlist has moved to {db_path} "
+            "and its JSON files are out of date"
+        )
+
     return {
         "search": cmd_search,
         "watch": cmd_watch,